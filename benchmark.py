@@ -3,19 +3,28 @@
 from __future__ import annotations
 
 import csv
+import hashlib
+import io
+import mmap
 import os
-import random
+import select
+import shelve
+import shutil
 import statistics
+import struct
 import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
 
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-import networkx as nx
+import numpy as np
+
+import hp_bt
+import hp_dp
 
 
 N_SIZES = [5, 6, 9, 11, 16, 20]
@@ -24,18 +33,36 @@ DENSIDADES = ["esparso", "denso"]
 INSTANCIAS_POR_CONFIG = 5
 BASE_SEMENTE = 12345
 TIMEOUT_SEC = 2.0
+# Prazo para um processo --server carregar e sinalizar que está pronto.
+TIMEOUT_INICIO_SEC = 30.0
 
 DIR_INSTANCIAS = "instancias"
 DIR_IMAGENS = "imagens"
+DIR_CACHE = "cache"
+
+ARQ_INSTANCIAS_BIN = os.path.join(DIR_INSTANCIAS, "instancias.bin")
 
 ARQ_RESULTADOS = "results.csv"
 ARQ_RESUMO = "summary.csv"
+ARQ_CACHE = os.path.join(DIR_CACHE, "hp_results.db")
+# Incrementar quando o formato das entradas do cache mudar.
+VERSAO_CACHE = 2
+ARQS_SOLVERS = ["hp_bt.py", "hp_dp.py", "hp_dp_numba.py"]
+
+SOLVERS = {"bt": hp_bt, "dp": hp_dp}
+METRICAS: Dict[str, Tuple[Optional[str], Optional[str]]] = {
+    "bt": ("recursive_calls", None),
+    "dp": ("states", "transitions"),
+}
 
-HP_BT = os.path.join(os.path.dirname(__file__), "hp_bt.py")
-HP_DP = os.path.join(os.path.dirname(__file__), "hp_dp.py")
+Tarefa = Tuple[str, int, str, int, int, str, str, int]
 
+# Um único worker reaproveitado por processo: os solvers rodam no próprio
+# interpretador, sem pagar a inicialização de um novo a cada execução.
+_EXECUTOR = ThreadPoolExecutor(max_workers=1)
 
-@dataclass
+
+@dataclass(slots=True)
 class RunResult:
     algoritmo: str
     n_vertices: int
@@ -45,11 +72,14 @@ class RunResult:
     status_execucao: str
     resposta: str
     tempo_segundos: float
+    tempo_total_segundos: float
     metrica_1: Optional[int]
     metrica_2: Optional[int]
     arquivo_instancia: str
     arquivo_imagem: str
     stderr_ultimas_linhas: str
+    do_cache: bool
+    repetida: bool
 
 
 def _p_por_densidade(n: int, densidade: str) -> float:
@@ -61,127 +91,306 @@ def _p_por_densidade(n: int, densidade: str) -> float:
 
 
 def gerar_grafo_gnp(n: int, p: float, seed: int) -> List[Set[int]]:
-    rng = random.Random(seed)
+    # Sorteia toda a matriz de uma vez e fica só com o triângulo superior.
+    rng = np.random.default_rng(seed)
+    i_idx, j_idx = np.nonzero(np.triu(rng.random((n, n)) < p, 1))
     adj: List[Set[int]] = [set() for _ in range(n)]
-    for i in range(n):
-        for j in range(i + 1, n):
-            if rng.random() < p:
-                adj[i].add(j)
-                adj[j].add(i)
+    for i, j in zip(i_idx.tolist(), j_idx.tolist()):
+        adj[i].add(j)
+        adj[j].add(i)
     return adj
 
 
+def _arestas(n: int, adj: List[Set[int]]) -> List[Tuple[int, int]]:
+    return sorted((v, u) for v in range(n) for u in adj[v] if v < u)
+
+
 def salvar_instancia(path: str, n: int, adj: List[Set[int]]) -> None:
-    edges: List[Tuple[int, int]] = []
-    for v in range(n):
-        for u in adj[v]:
-            if v < u:
-                edges.append((v, u))
+    edges = _arestas(n, adj)
     with open(path, "w", encoding="utf-8") as f:
         f.write(f"{n} {len(edges)}\n")
         for v, u in edges:
             f.write(f"{v} {u}\n")
 
 
-def plotar_grafo_png(path_png: str, n: int, adj: List[Set[int]], titulo: str) -> None:
-    G = nx.Graph()
-    G.add_nodes_from(range(n))
-    for v in range(n):
-        for u in adj[v]:
-            if v < u:
-                G.add_edge(v, u)
-
-    pos = nx.spring_layout(G, seed=1)
-
-    plt.figure()
-    plt.title(titulo)
-    nx.draw_networkx(G, pos=pos, with_labels=True, node_size=400, font_size=8)
-    plt.axis("off")
-    plt.tight_layout()
-    plt.savefig(path_png, dpi=150)
-    plt.close()
-
-
-def _stderr_tail(stderr_str: str, max_lines: int = 5) -> str:
-    lines = [ln for ln in stderr_str.splitlines() if ln.strip()]
-    return "\n".join(lines[-max_lines:])
-
-
-def _run_solver(script_path: str, arquivo_entrada: str, timeout_sec: float) -> Tuple[str, str, str, float]:
-    cmd = [sys.executable, script_path, arquivo_entrada, "--stats"]
+def salvar_instancias_bin(path: str, instancias: List[Tuple[int, List[Tuple[int, int]]]]) -> None:
+    # Layout: <I total> <Q offset> * total, seguido de um registro por
+    # instância: <II n m> e m pares <ii v u>.
+    cabecalho = 4 + 8 * len(instancias)
+    corpo = io.BytesIO()
+    offsets: List[int] = []
+    for n, edges in instancias:
+        offsets.append(cabecalho + corpo.tell())
+        corpo.write(struct.pack("<II", n, len(edges)))
+        corpo.write(struct.pack(f"<{2 * len(edges)}i", *(x for e in edges for x in e)))
+
+    dados = struct.pack(f"<I{len(offsets)}Q", len(offsets), *offsets) + corpo.getvalue()
+    with open(path, "wb") as f:
+        f.write(dados)
+
+
+def ler_instancia_bin(path: str, indice: int) -> Tuple[int, List[Tuple[int, int]]]:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        (offset,) = struct.unpack_from("<Q", mm, 4 + 8 * indice)
+        n, m = struct.unpack_from("<II", mm, offset)
+        flat = struct.unpack_from(f"<{2 * m}i", mm, offset + 8)
+    return n, list(zip(flat[0::2], flat[1::2]))
+
+
+def salvar_dot(path_dot: str, n: int, arestas: List[Tuple[int, int]], titulo: str) -> None:
+    linhas = [f'graph "{titulo}" {{', f'  label="{titulo}";', "  node [shape=circle];"]
+    linhas.extend(f"  {v};" for v in range(n))
+    linhas.extend(f"  {v} -- {u};" for v, u in arestas)
+    linhas.append("}")
+    with open(path_dot, "w", encoding="utf-8") as f:
+        f.write("\n".join(linhas) + "\n")
+
+
+def renderizar_pngs(pares: List[Tuple[str, str]]) -> Set[str]:
+    """Renderiza os .dot com o Graphviz (neato), um processo `dot` por núcleo.
+
+    Devolve os PNGs que de fato existem ao final da renderização.
+    """
+    if not pares:
+        return set()
+    if shutil.which("dot") is None:
+        print("Graphviz (dot) não encontrado; mantendo apenas os arquivos .dot", file=sys.stderr)
+        return set()
+
+    # Cada processo recebe uma fatia dos arquivos e renderiza todos numa
+    # única chamada; as fatias rodam em paralelo.
+    k = min(os.cpu_count() or 1, len(pares))
+    procs = [
+        subprocess.Popen(["dot", "-Kneato", "-Tpng", "-O", *(d for d, _ in pares[i::k])])
+        for i in range(k)
+    ]
+    for proc in procs:
+        if proc.wait() != 0:
+            print(f"dot terminou com código {proc.returncode}", file=sys.stderr)
+
+    # -O grava "<arquivo>.dot.png"; renomeia para o nome esperado. Uma fatia
+    # que falhou pode ter renderizado só parte dos arquivos.
+    gerados: Set[str] = set()
+    for arq_dot, arq_png in pares:
+        if os.path.exists(arq_dot + ".png"):
+            os.replace(arq_dot + ".png", arq_png)
+            gerados.add(arq_png)
+    return gerados
+
+
+def run_in_process(
+    solve_fn: Callable[..., Tuple[str, Dict[str, int]]],
+    n: int,
+    adj: List[Set[int]],
+    timeout_sec: float,
+) -> Tuple[str, str, Dict[str, int], str, float]:
+    cancelar = threading.Event()
 
     t0 = time.perf_counter()
+    fut = _EXECUTOR.submit(solve_fn, n, adj, cancelar.is_set)
     try:
-        cp = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=timeout_sec,
-            check=False,
-        )
+        out, stats = fut.result(timeout=timeout_sec)
         dt = time.perf_counter() - t0
-    except subprocess.TimeoutExpired as e:
+    except FuturesTimeoutError:
         dt = time.perf_counter() - t0
-        out = (e.stdout or "").strip()
-        err = (e.stderr or "").strip()
-        return "timeout", out, err, dt
+        cancelar.set()
+        # Aguarda o solver abandonar a busca antes de liberar o worker.
+        fut.exception()
+        return "timeout", "", {}, "", dt
     except Exception as e:
         dt = time.perf_counter() - t0
-        return "erro", "", str(e), dt
-
-    out = (cp.stdout or "").strip()
-    err = (cp.stderr or "").strip()
+        return "erro", "", {}, str(e), dt
 
-    if cp.returncode != 0:
-        return "erro", out, err, dt
+    if out not in {"SIM", "NÃO"}:
+        return "erro", out, stats, "", dt
+
+    return "ok", out, stats, "", dt
+
+
+def _digest_solvers() -> str:
+    # Qualquer alteração no código dos solvers invalida o cache inteiro.
+    h = hashlib.blake2b(digest_size=16)
+    base = os.path.dirname(os.path.abspath(__file__))
+    for nome in ARQS_SOLVERS:
+        path = os.path.join(base, nome)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()
+
+
+DIGEST_SOLVERS = _digest_solvers()
+
+
+def _chave_cache(algo: str, n: int, arestas: List[Tuple[int, int]]) -> str:
+    dados = f"v{VERSAO_CACHE}:{DIGEST_SOLVERS}:{algo}:{n}:" + " ".join(f"{v},{u}" for v, u in arestas)
+    return hashlib.blake2b(dados.encode("ascii")).hexdigest()
+
+
+def _run_result(
+    task: Tarefa,
+    status: str,
+    resposta: str,
+    tempo: float,
+    tempo_total: float,
+    m1: Optional[int],
+    m2: Optional[int],
+    err: str,
+    do_cache: bool = False,
+    repetida: bool = False,
+) -> RunResult:
+    algo, n, densidade, instance_id, seed, arq_inst, arq_png, _ = task
+    return RunResult(
+        algoritmo=algo,
+        n_vertices=n,
+        densidade=densidade,
+        id_instancia=instance_id,
+        semente=seed,
+        status_execucao=status,
+        resposta=resposta,
+        tempo_segundos=tempo,
+        tempo_total_segundos=tempo_total,
+        metrica_1=m1,
+        metrica_2=m2,
+        arquivo_instancia=arq_inst,
+        arquivo_imagem=arq_png,
+        stderr_ultimas_linhas=err,
+        do_cache=do_cache,
+        repetida=repetida,
+    )
+
+
+def _metricas(algo: str, stats: Dict[str, int]) -> Tuple[Optional[int], Optional[int]]:
+    chave_1, chave_2 = METRICAS[algo]
+    return (
+        stats.get(chave_1) if chave_1 else None,
+        stats.get(chave_2) if chave_2 else None,
+    )
+
+
+def _tempo_solver(stats: Dict[str, int], dt: float) -> float:
+    # Tempo medido pelo próprio solver, sem despacho nem inicialização; sem
+    # ele (timeout ou erro), vale o tempo total observado pelo benchmark.
+    return stats["solve_ns"] / 1e9 if "solve_ns" in stats else dt
+
+
+def _solve_one(task: Tarefa) -> RunResult:
+    algo, n, indice = task[0], task[1], task[7]
+    solver = SOLVERS[algo]
+
+    _, edges = ler_instancia_bin(ARQ_INSTANCIAS_BIN, indice)
+    adj = solver.build_graph(n, edges)
+    status, out, stats, err, dt = run_in_process(solver.solve, n, adj, TIMEOUT_SEC)
+
+    m1, m2 = _metricas(algo, stats)
+    return _run_result(task, status, out if status == "ok" else "", _tempo_solver(stats, dt), dt, m1, m2, err)
+
+
+def _iniciar_servidor(algo: str) -> subprocess.Popen:
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"hp_{algo}.py")
+    proc = subprocess.Popen(
+        [sys.executable, script, "--server"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        bufsize=0,
+        env={**os.environ, "PYTHONIOENCODING": "utf-8"},
+    )
+
+    # Espera o servidor terminar de carregar (imports, aquecimento da DP),
+    # para que a inicialização não conte no timeout da próxima instância.
+    pronto, _, _ = select.select([proc.stdout], [], [], TIMEOUT_INICIO_SEC)
+    linha = proc.stdout.readline().decode("utf-8").strip() if pronto else ""
+    if linha != "PRONTO":
+        proc.kill()
+        proc.wait()
+        raise RuntimeError(f"servidor hp_{algo}.py não ficou pronto em {TIMEOUT_INICIO_SEC:.0f} s")
+    return proc
+
+
+def _run_server(
+    servidores: Dict[str, subprocess.Popen],
+    algo: str,
+    arquivo_entrada: str,
+    timeout_sec: float,
+) -> Tuple[str, str, Dict[str, int], str, float]:
+    proc = servidores[algo]
 
+    t0 = time.perf_counter()
+    try:
+        proc.stdin.write(arquivo_entrada.encode("utf-8") + b"\n")
+        pronto, _, _ = select.select([proc.stdout], [], [], timeout_sec)
+        linha = proc.stdout.readline().decode("utf-8").strip() if pronto else None
+        dt = time.perf_counter() - t0
+    except OSError as e:
+        linha, dt = "", time.perf_counter() - t0
+        err = str(e)
+    else:
+        err = ""
+
+    if linha is None or not linha:
+        # Timeout ou worker morto: descarta o processo e sobe outro.
+        proc.kill()
+        proc.wait()
+        servidores[algo] = _iniciar_servidor(algo)
+        if linha is None:
+            return "timeout", "", {}, "", dt
+        return "erro", "", {}, err or "servidor encerrou sem resposta", dt
+
+    out, *campos = linha.split(" ")
+    if out == "ERRO":
+        return "erro", "", {}, " ".join(campos), dt
     if out not in {"SIM", "NÃO"}:
-        return "erro", out, err, dt
-
-    return "ok", out, err, dt
-
-
-def _parse_bt_metrics(stderr_str: str) -> Tuple[Optional[int], Optional[int]]:
-    for line in stderr_str.splitlines():
-        line = line.strip()
-        if line.startswith("[stats]") and "recursive_calls=" in line:
-            try:
-                val = int(line.split("recursive_calls=")[-1].strip())
-                return val, None
-            except ValueError:
-                return None, None
-    return None, None
-
-
-def _parse_dp_metrics(stderr_str: str) -> Tuple[Optional[int], Optional[int]]:
-    for line in stderr_str.splitlines():
-        line = line.strip()
-        if line.startswith("[stats]") and "states=" in line and "transitions=" in line:
-            try:
-                parts = line.replace("[stats]", "").strip().split()
-                kv = {}
-                for p in parts:
-                    if "=" in p:
-                        k, v = p.split("=", 1)
-                        kv[k] = v
-                states = int(kv.get("states")) if "states" in kv else None
-                trans = int(kv.get("transitions")) if "transitions" in kv else None
-                return states, trans
-            except Exception:
-                return None, None
-    return None, None
-
-
-def run_all(plotar: bool) -> List[RunResult]:
-    if not os.path.exists(HP_BT):
-        raise FileNotFoundError(f"Arquivo não encontrado: {HP_BT}")
-    if not os.path.exists(HP_DP):
-        raise FileNotFoundError(f"Arquivo não encontrado: {HP_DP}")
+        return "erro", out, {}, "", dt
+
+    stats = {k: int(v) for k, v in (c.split("=", 1) for c in campos)}
+    return "ok", out, stats, "", dt
+
+
+def _executar_pool(tasks: List[Tarefa], pendentes: List[int]) -> Iterator[Tuple[int, RunResult]]:
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=hp_dp.warm_up) as ex:
+        futs = {ex.submit(_solve_one, tasks[i]): i for i in pendentes}
+        for fut in as_completed(futs):
+            yield futs[fut], fut.result()
+
+
+def _executar_isolado(tasks: List[Tarefa], pendentes: List[int]) -> Iterator[Tuple[int, RunResult]]:
+    # Um processo solver de longa duração por algoritmo, alimentado via
+    # stdin; só é reiniciado após timeout ou falha.
+    servidores = {algo: _iniciar_servidor(algo) for algo in SOLVERS}
+    try:
+        for i in pendentes:
+            task = tasks[i]
+            algo, arq_inst = task[0], task[5]
+            status, out, stats, err, dt = _run_server(servidores, algo, arq_inst, TIMEOUT_SEC)
+            m1, m2 = _metricas(algo, stats)
+            tempo = _tempo_solver(stats, dt)
+            yield i, _run_result(task, status, out if status == "ok" else "", tempo, dt, m1, m2, err)
+    finally:
+        for proc in servidores.values():
+            proc.stdin.close()
+            proc.wait()
+
+
+def run_all(
+    plotar: bool,
+    usar_cache: bool = True,
+    salvar_txt: bool = False,
+    isolado: bool = False,
+) -> List[RunResult]:
+    # Os servidores leem as instâncias dos arquivos texto.
+    salvar_txt = salvar_txt or isolado
 
     os.makedirs(DIR_INSTANCIAS, exist_ok=True)
-    os.makedirs(DIR_IMAGENS, exist_ok=True)
+    os.makedirs(DIR_CACHE, exist_ok=True)
+
+    tasks: List[Tarefa] = []
+    chaves: List[str] = []
+    instancias: List[Tuple[int, List[Tuple[int, int]]]] = []
+    pngs: List[Tuple[str, str]] = []
 
-    results: List[RunResult] = []
+    if plotar:
+        os.makedirs(DIR_IMAGENS, exist_ok=True)
 
     for n in N_SIZES:
         for densidade in DENSIDADES:
@@ -195,55 +404,93 @@ def run_all(plotar: bool) -> List[RunResult]:
                 arq_png = os.path.join(DIR_IMAGENS, f"{nome_base}.png")
 
                 adj = gerar_grafo_gnp(n=n, p=p, seed=seed)
-                salvar_instancia(arq_inst, n, adj)
+                arestas = _arestas(n, adj)
+                indice = len(instancias)
+                instancias.append((n, arestas))
+
+                if salvar_txt:
+                    salvar_instancia(arq_inst, n, adj)
+                else:
+                    arq_inst = f"{ARQ_INSTANCIAS_BIN}#{indice}"
 
                 if plotar:
-                    titulo = f"{nome_base} (p={p:.3f})"
-                    plotar_grafo_png(arq_png, n, adj, titulo=titulo)
+                    arq_dot = os.path.join(DIR_IMAGENS, f"{nome_base}.dot")
+                    salvar_dot(arq_dot, n, arestas, titulo=f"{nome_base} (p={p:.3f})")
+                    pngs.append((arq_dot, arq_png))
                 else:
                     arq_png = ""
 
-                status, out, err, dt = _run_solver(HP_BT, arq_inst, TIMEOUT_SEC)
-                m1, m2 = _parse_bt_metrics(err)
-                results.append(
-                    RunResult(
-                        algoritmo="bt",
-                        n_vertices=n,
-                        densidade=densidade,
-                        id_instancia=instance_id,
-                        semente=seed,
-                        status_execucao=status,
-                        resposta=out if status == "ok" else "",
-                        tempo_segundos=dt,
-                        metrica_1=m1,
-                        metrica_2=m2,
-                        arquivo_instancia=arq_inst,
-                        arquivo_imagem=arq_png,
-                        stderr_ultimas_linhas=_stderr_tail(err),
-                    )
+                for algo in SOLVERS:
+                    tasks.append((algo, n, densidade, instance_id, seed, arq_inst, arq_png, indice))
+                    chaves.append(_chave_cache(algo, n, arestas))
+
+    # Todas as instâncias num único arquivo, gravado de uma vez; os workers
+    # leem cada uma pelo índice do cabeçalho.
+    salvar_instancias_bin(ARQ_INSTANCIAS_BIN, instancias)
+
+    # Só aponta arquivo_imagem para PNGs que foram de fato gerados.
+    gerados = renderizar_pngs(pngs)
+    tasks = [t if not t[6] or t[6] in gerados else t[:6] + ("",) + t[7:] for t in tasks]
+
+    por_indice: Dict[int, RunResult] = {}
+
+    # Resultados "ok" de execuções anteriores ficam em disco, indexados
+    # pelo conjunto de arestas; timeouts e erros são sempre refeitos.
+    with shelve.open(ARQ_CACHE) as cache:
+        pendentes: List[int] = []
+        lidas: Set[str] = set()
+        for i, task in enumerate(tasks):
+            salvo = cache.get(chaves[i]) if usar_cache else None
+            if salvo is None:
+                pendentes.append(i)
+                continue
+            resposta, tempo, tempo_total, m1, m2 = salvo
+            repetida = chaves[i] in lidas
+            lidas.add(chaves[i])
+            por_indice[i] = _run_result(
+                task, "ok", resposta, tempo, tempo_total, m1, m2, "", do_cache=True, repetida=repetida
+            )
+
+        # Instâncias com o mesmo conjunto de arestas (comuns para n pequeno)
+        # são resolvidas uma vez só; as repetidas reaproveitam o resultado.
+        repetidas: Dict[int, List[int]] = {}
+        primeira: Dict[str, int] = {}
+        unicas: List[int] = []
+        for i in pendentes:
+            j = primeira.setdefault(chaves[i], i)
+            if j == i:
+                unicas.append(i)
+            else:
+                repetidas.setdefault(j, []).append(i)
+
+        # Só a fase de resolução vai para o pool (ou para os servidores); a
+        # geração e os PNGs acima ficam no processo principal.
+        executar = _executar_isolado if isolado else _executar_pool
+        for i, r in executar(tasks, unicas):
+            por_indice[i] = r
+            for k in repetidas.get(i, []):
+                por_indice[k] = _run_result(
+                    tasks[k],
+                    r.status_execucao,
+                    r.resposta,
+                    r.tempo_segundos,
+                    r.tempo_total_segundos,
+                    r.metrica_1,
+                    r.metrica_2,
+                    r.stderr_ultimas_linhas,
+                    do_cache=True,
+                    repetida=True,
                 )
-
-                status, out, err, dt = _run_solver(HP_DP, arq_inst, TIMEOUT_SEC)
-                m1, m2 = _parse_dp_metrics(err)
-                results.append(
-                    RunResult(
-                        algoritmo="dp",
-                        n_vertices=n,
-                        densidade=densidade,
-                        id_instancia=instance_id,
-                        semente=seed,
-                        status_execucao=status,
-                        resposta=out if status == "ok" else "",
-                        tempo_segundos=dt,
-                        metrica_1=m1,
-                        metrica_2=m2,
-                        arquivo_instancia=arq_inst,
-                        arquivo_imagem=arq_png,
-                        stderr_ultimas_linhas=_stderr_tail(err),
-                    )
+            if r.status_execucao == "ok":
+                cache[chaves[i]] = (
+                    r.resposta,
+                    r.tempo_segundos,
+                    r.tempo_total_segundos,
+                    r.metrica_1,
+                    r.metrica_2,
                 )
 
-    return results
+    return [por_indice[i] for i in range(len(tasks))]
 
 
 def write_results_csv(rows: List[RunResult], path: str) -> None:
@@ -258,14 +505,17 @@ def write_results_csv(rows: List[RunResult], path: str) -> None:
             "status_execucao",
             "resposta",
             "tempo_segundos",
+            "tempo_total_segundos",
             "metrica_1",
             "metrica_2",
             "arquivo_instancia",
             "arquivo_imagem",
             "stderr_ultimas_linhas",
+            "do_cache",
+            "repetida",
         ])
-        for r in rows:
-            w.writerow([
+        w.writerows(
+            (
                 r.algoritmo,
                 r.n_vertices,
                 r.densidade,
@@ -274,8 +524,89 @@ def write_results_csv(rows: List[RunResult], path: str) -> None:
                 r.status_execucao,
                 r.resposta,
                 f"{r.tempo_segundos:.6f}",
+                f"{r.tempo_total_segundos:.6f}",
                 "" if r.metrica_1 is None else r.metrica_1,
                 "" if r.metrica_2 is None else r.metrica_2,
                 r.arquivo_instancia,
                 r.arquivo_imagem,
                 r.stderr_ultimas_linhas,
+                int(r.do_cache),
+                int(r.repetida),
+            )
+            for r in rows
+        )
+
+
+def _media_mediana(vals: List[float]) -> Tuple[str, str]:
+    if not vals:
+        return "", ""
+    return f"{statistics.mean(vals):.6f}", f"{statistics.median(vals):.6f}"
+
+
+def write_summary_csv(rows: List[RunResult], path: str) -> None:
+    grupos: Dict[Tuple[str, int, str], List[RunResult]] = {}
+    for r in rows:
+        grupos.setdefault((r.algoritmo, r.n_vertices, r.densidade), []).append(r)
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow([
+            "algoritmo",
+            "n_vertices",
+            "densidade",
+            "execucoes",
+            "ok",
+            "timeouts",
+            "erros",
+            "do_cache",
+            "tempo_medio",
+            "tempo_mediano",
+            "metrica_1_media",
+            "metrica_1_mediana",
+            "metrica_2_media",
+            "metrica_2_mediana",
+        ])
+        for (algoritmo, n, densidade), grupo in sorted(grupos.items()):
+            oks = [r for r in grupo if r.status_execucao == "ok"]
+            # Os tempos do cache em disco foram medidos com o mesmo código
+            # dos solvers e entram nas médias; cópias de uma instância
+            # idêntica na mesma execução não, para não contar a mesma
+            # medição duas vezes.
+            tempo_med, tempo_mdn = _media_mediana([r.tempo_segundos for r in oks if not r.repetida])
+            m1_med, m1_mdn = _media_mediana([r.metrica_1 for r in oks if r.metrica_1 is not None])
+            m2_med, m2_mdn = _media_mediana([r.metrica_2 for r in oks if r.metrica_2 is not None])
+            w.writerow([
+                algoritmo,
+                n,
+                densidade,
+                len(grupo),
+                len(oks),
+                sum(1 for r in grupo if r.status_execucao == "timeout"),
+                sum(1 for r in grupo if r.status_execucao == "erro"),
+                sum(1 for r in grupo if r.do_cache),
+                tempo_med,
+                tempo_mdn,
+                m1_med,
+                m1_mdn,
+                m2_med,
+                m2_mdn,
+            ])
+
+
+def main() -> int:
+    args = sys.argv[1:]
+    plotar = "--plot" in args
+    usar_cache = "--sem-cache" not in args
+    salvar_txt = "--txt" in args
+    isolado = "--isolado" in args
+
+    results = run_all(plotar=plotar, usar_cache=usar_cache, salvar_txt=salvar_txt, isolado=isolado)
+    write_results_csv(results, ARQ_RESULTADOS)
+    write_summary_csv(results, ARQ_RESUMO)
+
+    print(f"Resultados salvos em {ARQ_RESULTADOS} e {ARQ_RESUMO}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,27 +4,36 @@ from __future__ import annotations
 
 import sys
 import random
+import time
+from itertools import islice
 from collections import deque
-from typing import List, Set, Tuple, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple, Optional
 
 
 def parse_graph(path: str) -> Tuple[int, List[Set[int]]]:
-    with open(path, "r", encoding="utf-8") as f:
-        raw_lines = [line.strip() for line in f if line.strip()]
+    with open(path, "rb") as f:
+        tokens = f.read().split()
 
-    first = raw_lines[0].split()
-    n, m = map(int, first)
+    it = map(int, tokens)
+    n, m = next(it), next(it)
 
+    edges = list(islice(zip(it, it), m))
+    if len(edges) != m:
+        raise ValueError(f"cabeçalho declara {m} arestas, arquivo contém {len(edges)}")
+
+    return n, build_graph(n, edges)
+
+
+def build_graph(n: int, edges: Iterable[Iterable[int]]) -> List[Set[int]]:
     adj: List[Set[int]] = [set() for _ in range(n)]
 
-    for i in range(1, m + 1):
-        v, u = map(int, raw_lines[i].split())
+    for v, u in edges:
         if v == u:
             continue
         adj[v].add(u)
         adj[u].add(v)
 
-    return n, adj
+    return adj
 
 
 def generate_random_graph(n: int, dense: bool, seed: Optional[int]) -> Tuple[int, List[Set[int]]]:
@@ -64,47 +73,141 @@ def is_connected(n: int, adj: List[Set[int]]) -> bool:
     return all(seen)
 
 
-def has_hamiltonian_path(n: int, adj: List[Set[int]]) -> Tuple[bool, int]:
+def has_hamiltonian_path(
+    n: int,
+    adj: List[Set[int]],
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Tuple[bool, int]:
     if n <= 1:
         return n == 1, 0
 
-    if any(len(adj[v]) == 0 for v in range(n)):
+    deg = list(map(len, adj))
+
+    if 0 in deg:
         return False, 0
 
     if not is_connected(n, adj):
         return False, 0
 
-    visited = [False] * n
+    leaves = [v for v in range(n) if deg[v] == 1]
+
+    # Toda folha é obrigatoriamente extremidade do caminho.
+    if len(leaves) > 2:
+        return False, 0
+
+    # Dirac: grau mínimo >= n/2 garante ciclo Hamiltoniano, logo caminho.
+    if n >= 3 and 2 * min(deg) >= n:
+        return True, 0
+
+    neighbors = [tuple(sorted(adj[v], key=deg.__getitem__)) for v in range(n)]
+    # free[w] = vizinhos de w ainda não visitados ou na extremidade atual.
+    free = deg[:]
+
+    # Com folhas, basta partir de uma delas (o caminho pode ser invertido).
+    starts = leaves[:1] if leaves else range(n)
+
     calls = 0
-    neighbors = [sorted(adj[v], key=lambda x: len(adj[x])) for v in range(n)]
+    visited = 0
+    # DFS iterativa: cada quadro guarda o vértice e o iterador dos candidatos
+    # restantes; a raiz virtual (-1) enumera os vértices iniciais.
+    stack: List[Tuple[int, Iterator[int]]] = [(-1, iter(starts))]
+
+    while True:
+        v, it = stack[-1]
+        for u in it:
+            if not visited >> u & 1:
+                break
+        else:
+            if v < 0:
+                return False, calls
+            stack.pop()
+            visited ^= 1 << v
+            for w in neighbors[v]:
+                free[w] += 1
+            continue
 
-    def dfs(v: int, depth: int) -> bool:
-        nonlocal calls
         calls += 1
-        if depth == n:
-            return True
-        for u in neighbors[v]:
-            if not visited[u]:
-                visited[u] = True
-                if dfs(u, depth + 1):
-                    return True
-                visited[u] = False
-        return False
-
-    for start in range(n):
-        visited[start] = True
-        if dfs(start, 1):
+        if should_stop is not None and not calls & 1023 and should_stop():
+            raise TimeoutError("busca interrompida")
+        if len(stack) == n:
             return True, calls
-        visited[start] = False
 
-    return False, calls
+        visited |= 1 << u
+        nb = neighbors[u]
+
+        # Ao sair de u, ele vira vértice interno do caminho. Um vizinho não
+        # visitado que fica isolado com isso só pode ser o último vértice.
+        stranded = -1
+        for w in nb:
+            free[w] -= 1
+            if not free[w] and not visited >> w & 1:
+                stranded = w if stranded == -1 else -2
+        if stranded != -1:
+            nb = (stranded,) if stranded >= 0 and len(stack) + 1 == n else ()
+
+        stack.append((u, iter(nb)))
+
+
+def solve(
+    n: int,
+    adj: List[Set[int]],
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Tuple[str, Dict[str, int]]:
+    t0 = time.perf_counter_ns()
+    ok, calls = has_hamiltonian_path(n, adj, should_stop)
+    solve_ns = time.perf_counter_ns() - t0
+    return "SIM" if ok else "NÃO", {"recursive_calls": calls, "solve_ns": solve_ns}
+
+
+def serve() -> int:
+    # Modo servidor: um caminho de instância por linha no stdin; para cada
+    # um, uma linha no stdout com a resposta seguida das métricas.
+    # A linha PRONTO avisa que o servidor já pode receber instâncias.
+    print("PRONTO", flush=True)
+
+    for line in sys.stdin:
+        path = line.strip()
+        if not path:
+            continue
+        try:
+            n, adj = parse_graph(path)
+            answer, metrics = solve(n, adj)
+        except Exception as e:
+            print(f"ERRO {e}", flush=True)
+            continue
+        print(answer, *(f"{k}={v}" for k, v in metrics.items()), flush=True)
+
+    return 0
 
 
 def main() -> int:
     args = sys.argv[1:]
 
+    if args and args[0] == "--server":
+        return serve()
+
     stats = "--stats" in args
     if stats:
         args.remove("--stats")
 
     if args[0] == "--random":
+        n = int(args[1])
+        mode = args[2]
+        seed = None
+        if "--seed" in args:
+            seed = int(args[args.index("--seed") + 1])
+        n, adj = generate_random_graph(n, dense=(mode == "--dense"), seed=seed)
+    else:
+        n, adj = parse_graph(args[0])
+
+    answer, metrics = solve(n, adj)
+
+    print(answer)
+    if stats:
+        print("[stats] " + " ".join(f"{k}={v}" for k, v in metrics.items()), file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,75 +4,181 @@ from __future__ import annotations
 
 import sys
 import random
-from typing import List, Set, Tuple, Optional
+import time
+from array import array
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Tuple, Optional
 
+try:
+    import numpy as np
+    from hp_dp_numba import has_hamiltonian_path_dp_numba
+except ImportError:
+    has_hamiltonian_path_dp_numba = None
 
-def parse_graph(path: str) -> Tuple[int, List[Set[int]]]:
-    with open(path, "r", encoding="utf-8") as f:
-        raw = [line.strip() for line in f if line.strip()]
 
-    n, m = map(int, raw[0].split())
-    adj: List[Set[int]] = [set() for _ in range(n)]
+def parse_graph(path: str) -> Tuple[int, List[int]]:
+    with open(path, "rb") as f:
+        tokens = f.read().split()
 
-    for i in range(1, m + 1):
-        v, u = map(int, raw[i].split())
+    it = map(int, tokens)
+    n, m = next(it), next(it)
+
+    edges = list(islice(zip(it, it), m))
+    if len(edges) != m:
+        raise ValueError(f"cabeçalho declara {m} arestas, arquivo contém {len(edges)}")
+
+    return n, build_graph(n, edges)
+
+
+def build_graph(n: int, edges: Iterable[Iterable[int]]) -> List[int]:
+    adj_mask: List[int] = [0] * n
+
+    for v, u in edges:
         if v == u:
             continue
-        adj[v].add(u)
-        adj[u].add(v)
+        adj_mask[v] |= 1 << u
+        adj_mask[u] |= 1 << v
 
-    return n, adj
+    return adj_mask
 
 
-def generate_random_graph(n: int, dense: bool, seed: Optional[int]) -> Tuple[int, List[Set[int]]]:
+def generate_random_graph(n: int, dense: bool, seed: Optional[int]) -> Tuple[int, List[int]]:
     rng = random.Random(seed)
-    adj: List[Set[int]] = [set() for _ in range(n)]
+    adj_mask: List[int] = [0] * n
 
     p = 0.8 if dense else min(4.0 / n, 0.2)
 
     for i in range(n):
         for j in range(i + 1, n):
             if rng.random() < p:
-                adj[i].add(j)
-                adj[j].add(i)
+                adj_mask[i] |= 1 << j
+                adj_mask[j] |= 1 << i
+
+    return n, adj_mask
 
-    return n, adj
 
+def _dp_table(n: int, num_masks: int) -> array:
+    # Uma palavra de máquina por máscara (em vez de uma lista de objetos
+    # int): 4 bytes por entrada enquanto os n bits de extremidade couberem.
+    typecode = "I" if n <= 8 * array("I").itemsize else "Q"
+    return array(typecode, bytes(array(typecode).itemsize * num_masks))
 
-def has_hamiltonian_path_dp(n: int, adj: List[Set[int]]) -> Tuple[bool, int, int]:
+
+def has_hamiltonian_path_dp(
+    n: int,
+    adj_mask: List[int],
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Tuple[bool, int, int]:
     if n <= 1:
         return n == 1, 1 if n == 1 else 0, 0
 
+    # As duas versões percorrem as máscaras na mesma ordem de BFS e param no
+    # mesmo ponto, logo states/transitions não dependem de qual delas roda.
+    # A versão compilada roda em blocos de máscaras e consulta should_stop
+    # entre um bloco e outro.
+    if has_hamiltonian_path_dp_numba is not None and n < 63:
+        ok, states, transitions = has_hamiltonian_path_dp_numba(
+            n, np.asarray(adj_mask, dtype=np.int64), should_stop
+        )
+        return bool(ok), int(states), int(transitions)
+
+    return _has_hamiltonian_path_dp_python(n, adj_mask, should_stop)
+
+
+def _has_hamiltonian_path_dp_python(
+    n: int,
+    adj_mask: List[int],
+    should_stop: Optional[Callable[[], bool]],
+) -> Tuple[bool, int, int]:
     max_mask = 1 << n
-    dp = [[False] * n for _ in range(max_mask)]
+    # dp[mask] = conjunto (bitmask) dos vértices v em que termina algum
+    # caminho simples que visita exatamente os vértices de mask.
+    dp = _dp_table(n, max_mask)
 
+    full_mask = max_mask - 1
     states = 0
     transitions = 0
 
     for v in range(n):
-        dp[1 << v][v] = True
+        dp[1 << v] = 1 << v
         states += 1
 
-    for mask in range(max_mask):
-        for v in range(n):
-            if not (mask & (1 << v)) or not dp[mask][v]:
-                continue
-            for u in adj[v]:
-                if mask & (1 << u):
-                    continue
-                next_mask = mask | (1 << u)
+    # Só as máscaras alcançáveis são visitadas, em ordem de BFS a partir dos
+    # vértices isolados (logo, em ordem de popcount). A fila cresce durante
+    # a iteração: cada máscara entra uma única vez, quando é alcançada. Como
+    # a tabela, guarda palavras de máquina (máscaras também têm n bits).
+    queue = array(dp.typecode, [1 << v for v in range(n)])
+    for i, mask in enumerate(queue):
+        if should_stop is not None and not i & 1023 and should_stop():
+            raise TimeoutError("busca interrompida")
+        cand = dp[mask]
+        while cand:
+            low = cand & -cand
+            cand ^= low
+            rem = adj_mask[low.bit_length() - 1] & ~mask
+            while rem:
+                bit = rem & -rem
+                rem ^= bit
+                next_mask = mask | bit
                 transitions += 1
-                if not dp[next_mask][u]:
-                    dp[next_mask][u] = True
+                ends = dp[next_mask]
+                if not ends & bit:
+                    if not ends:
+                        if next_mask == full_mask:
+                            # Primeiro caminho Hamiltoniano encontrado.
+                            return True, states + 1, transitions
+                        queue.append(next_mask)
+                    dp[next_mask] = ends | bit
                     states += 1
 
-    full_mask = (1 << n) - 1
-    return any(dp[full_mask][v] for v in range(n)), states, transitions
+    return False, states, transitions
+
+
+def solve(
+    n: int,
+    adj_mask: List[int],
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Tuple[str, Dict[str, int]]:
+    t0 = time.perf_counter_ns()
+    ok, states, transitions = has_hamiltonian_path_dp(n, adj_mask, should_stop)
+    solve_ns = time.perf_counter_ns() - t0
+    return "SIM" if ok else "NÃO", {"states": states, "transitions": transitions, "solve_ns": solve_ns}
+
+
+def warm_up() -> None:
+    # Resolve um grafo trivial para que a carga da versão compilada não
+    # entre no solve_ns da primeira instância medida.
+    has_hamiltonian_path_dp(2, build_graph(2, [(0, 1)]))
+
+
+def serve() -> int:
+    # Modo servidor: um caminho de instância por linha no stdin; para cada
+    # um, uma linha no stdout com a resposta seguida das métricas.
+    # A linha PRONTO avisa que o servidor já pode receber instâncias.
+    warm_up()
+    print("PRONTO", flush=True)
+
+    for line in sys.stdin:
+        path = line.strip()
+        if not path:
+            continue
+        try:
+            n, adj_mask = parse_graph(path)
+            answer, metrics = solve(n, adj_mask)
+        except Exception as e:
+            print(f"ERRO {e}", flush=True)
+            continue
+        print(answer, *(f"{k}={v}" for k, v in metrics.items()), flush=True)
+
+    return 0
 
 
 def main() -> int:
     args = sys.argv[1:]
 
+    if args and args[0] == "--server":
+        return serve()
+
     stats = "--stats" in args
     if stats:
         args.remove("--stats")
@@ -87,11 +193,12 @@ def main() -> int:
     else:
         n, adj = parse_graph(args[0])
 
-    ok, states, transitions = has_hamiltonian_path_dp(n, adj)
+    warm_up()
+    answer, metrics = solve(n, adj)
 
-    print("SIM" if ok else "NÃO")
+    print(answer)
     if stats:
-        print(f"[stats] states={states} transitions={transitions}", file=sys.stderr)
+        print("[stats] " + " ".join(f"{k}={v}" for k, v in metrics.items()), file=sys.stderr)
 
     return 0
 
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+from numba import njit
+
+
+def _word_dtype(n: int) -> type:
+    # Menor palavra que comporta n bits: com n <= 32 a tabela e a fila
+    # ocupam metade dos bytes de int64.
+    return np.uint32 if n <= 32 else np.int64
+
+
+# Máscaras processadas por chamada do kernel; entre uma chamada e outra o
+# wrapper consulta should_stop, o que limita a latência de um cancelamento.
+TAMANHO_BLOCO = 1 << 12
+
+
+def has_hamiltonian_path_dp_numba(
+    n: int,
+    adj_mask: np.ndarray,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Tuple[bool, int, int]:
+    max_mask = 1 << n
+    dtype = _word_dtype(n)
+    dp = np.zeros(max_mask, dtype=dtype)
+    queue = np.empty(max_mask, dtype=dtype)
+
+    for v in range(n):
+        dp[1 << v] = 1 << v
+        queue[v] = 1 << v
+
+    head, tail, states, transitions = 0, n, n, 0
+    while head < tail:
+        if should_stop is not None and should_stop():
+            raise TimeoutError("busca interrompida")
+        found, head, tail, states, transitions = _dp_kernel(
+            n, adj_mask, dp, queue, head, tail, states, transitions, TAMANHO_BLOCO
+        )
+        if found:
+            return True, states, transitions
+
+    return False, states, transitions
+
+
+@njit(cache=True, nogil=True)
+def _dp_kernel(
+    n: int,
+    adj_mask: np.ndarray,
+    dp: np.ndarray,
+    queue: np.ndarray,
+    head: int,
+    tail: int,
+    states: int,
+    transitions: int,
+    budget: int,
+) -> Tuple[bool, int, int, int, int]:
+    # Mesma DP de hp_dp: dp[mask] é o bitmask das extremidades possíveis
+    # de um caminho simples que visita exatamente os vértices de mask.
+    # Processa no máximo `budget` máscaras da fila de BFS a partir de
+    # `head` e devolve o estado para a chamada seguinte continuar.
+    full_mask = (np.int64(1) << n) - 1
+    stop = min(tail, head + budget)
+
+    while head < stop:
+        mask = np.int64(queue[head])
+        head += 1
+        cand = np.int64(dp[mask])
+        for v in range(n):
+            if not (cand >> v) & 1:
+                continue
+            rem = adj_mask[v] & ~mask
+            for u in range(n):
+                if not (rem >> u) & 1:
+                    continue
+                bit = np.int64(1) << u
+                next_mask = mask | bit
+                transitions += 1
+                ends = np.int64(dp[next_mask])
+                if not ends & bit:
+                    if ends == 0:
+                        if next_mask == full_mask:
+                            return True, head, tail, states + 1, transitions
+                        queue[tail] = next_mask
+                        tail += 1
+                    dp[next_mask] = ends | bit
+                    states += 1
+
+    return False, head, tail, states, transitions